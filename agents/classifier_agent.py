@@ -9,95 +9,223 @@ Responsible for categorizing customer support tickets into different types:
 - General complaints
 """
 
-from typing import Dict, Any, Literal
-from pydantic import BaseModel, Field
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
+import ahocorasick
 
-class ClassifierResult(BaseModel):
-    """Result of the classifier agent's analysis"""
-    category: Literal["bug", "feature request", "billing issue", "general complaint"] = Field(
-        ...,
-        description="The category of the ticket"
-    )
-    reasoning: str = Field(
-        ...,
-        description="Explanation of why this category was chosen"
-    )
+from models import (
+    BILLING_ISSUE, BUG, FEATURE_REQUEST, GENERAL_COMPLAINT,
+    Category, ClassifierResult, ClassifierResultModel
+)
 
 
-class ClassifierAgent:
-    """Agent that classifies customer support tickets into categories"""
+# Keywords for each category, in priority order: when a ticket matches
+# several categories, the earliest one in this list wins
+CATEGORY_KEYWORDS: List[Tuple[Category, List[str]]] = [
+    (BUG, ['crash', 'error', 'bug', 'fix', 'broken', 'not working']),
+    (FEATURE_REQUEST, ['feature', 'add', 'new', 'improve', 'enhancement', 'suggestion']),
+    (BILLING_ISSUE, ['bill', 'payment', 'charge', 'subscription', 'price', 'refund', 'credit']),
+]
+
+CATEGORY_REASONING = {
+    BUG: "The ticket mentions software issues, errors or crashes.",
+    FEATURE_REQUEST: "The ticket requests new functionality or improvements.",
+    BILLING_ISSUE: "The ticket relates to billing, payments, or pricing concerns.",
+    GENERAL_COMPLAINT: "The ticket contains general feedback that doesn't fit other categories.",
+}
+
+
+def _build_automaton() -> ahocorasick.Automaton:
+    """Build a single Aho-Corasick automaton over every category keyword
+    
+    Each keyword maps to (rank, category), where rank is the category's
+    position in CATEGORY_KEYWORDS.
+    """
+    automaton = ahocorasick.Automaton()
+    for rank, (category, keywords) in enumerate(CATEGORY_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (rank, category))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+@lru_cache(maxsize=1024)
+def _classify(combined_text: str) -> ClassifierResult:
+    """Classify a ticket's lowercased subject and message using keyword matching
+    
+    Results are cached, so tickets with the same text share one
+    (immutable) ClassifierResult. The category and reasoning always come
+    from the tables above, so the result is built without validation.
+    """
+    # Determine category based on keywords; the automaton reports matches
+    # in text order, so keep the highest-priority category seen
+    category: Category = GENERAL_COMPLAINT
+    best_rank = len(CATEGORY_KEYWORDS)
+    for _, (rank, matched) in _AUTOMATON.iter(combined_text):
+        if rank < best_rank:
+            best_rank, category = rank, matched
+            if rank == 0:
+                break
     
-    def __init__(self):
-        """Initialize the classifier agent"""
-        pass
+    return ClassifierResult(
+        category=category,
+        reasoning=CATEGORY_REASONING[category]
+    )
+
+
+def classify(ticket: Dict[str, Any]) -> ClassifierResult:
+    """Classify a ticket into a category
     
-    def classify(self, ticket: Dict[str, Any]) -> ClassifierResult:
-        """Classify a ticket into a category
+    Args:
+        ticket: The ticket data containing id, subject, message, etc.
         
-        Args:
-            ticket: The ticket data containing id, subject, message, etc.
-            
-        Returns:
-            ClassifierResult with category and reasoning
-        """
-        # MOCK IMPLEMENTATION
-        # For testing purposes, we're using a mock implementation instead of calling the OpenAI API
-        # This avoids API quota issues while testing
-        #
-        # To use the actual Pydantic AI implementation, replace this section with:
-        #
-        # from pydantic_ai import Agent
-        #
-        # # Create an agent for classification
-        # agent = Agent('openai:gpt-4o')
-        #
-        # # Set up the system prompt for classification
-        # system_prompt = """
-        # Analyze the customer support ticket and classify it into one of the following categories:
-        # - bug: Issues with the product not working as expected, errors, crashes
-        # - feature request: Requests for new functionality or improvements
-        # - billing issue: Problems with payments, subscriptions, or pricing
-        # - general complaint: Other complaints or feedback that don't fit the above
-        #
-        # Carefully analyze the subject and message content to determine the most appropriate category.
-        # Provide clear reasoning for your classification.
-        # """
-        #
-        # # Create a prompt from the ticket data
-        # prompt = f"Ticket ID: {ticket.get('id', 'Unknown')}\nSubject: {ticket.get('subject', 'No subject')}\nMessage: {ticket.get('message', 'No message')}\n\nPlease classify this ticket."
-        #
-        # # Run the agent with the output_type set to ClassifierResult
-        # result = agent.run_sync(
-        #     prompt,
-        #     system_prompt=system_prompt,
-        #     output_type=ClassifierResult
-        # )
-        #
-        # # Return the structured result
-        # return result.output
+    Returns:
+        ClassifierResult with category and reasoning
+    """
+    # MOCK IMPLEMENTATION
+    # For testing purposes, we're using a mock implementation instead of calling the OpenAI API
+    # This avoids API quota issues while testing
+    #
+    # To use the actual Pydantic AI implementation, replace this section with:
+    #
+    # from pydantic_ai import Agent
+    #
+    # # Create an agent for classification
+    # agent = Agent('openai:gpt-4o')
+    #
+    # # Set up the system prompt for classification
+    # system_prompt = """
+    # Analyze the customer support ticket and classify it into one of the following categories:
+    # - bug: Issues with the product not working as expected, errors, crashes
+    # - feature request: Requests for new functionality or improvements
+    # - billing issue: Problems with payments, subscriptions, or pricing
+    # - general complaint: Other complaints or feedback that don't fit the above
+    #
+    # Carefully analyze the subject and message content to determine the most appropriate category.
+    # Provide clear reasoning for your classification.
+    # """
+    #
+    # # Create a prompt from the ticket data
+    # prompt = f"Ticket ID: {ticket.get('id', 'Unknown')}\nSubject: {ticket.get('subject', 'No subject')}\nMessage: {ticket.get('message', 'No message')}\n\nPlease classify this ticket."
+    #
+    # # Run the agent with the output_type set to ClassifierResultModel
+    # result = agent.run_sync(
+    #     prompt,
+    #     system_prompt=system_prompt,
+    #     output_type=ClassifierResultModel
+    # )
+    #
+    # # Return the structured result
+    # return ClassifierResult(**result.output.model_dump())
+    
+    # Simple keyword-based classification logic
+    return _classify(_ticket_text(ticket))
+
+
+def classify_validated(ticket: Dict[str, Any]) -> ClassifierResultModel:
+    """Classify a ticket and return the result as a validated Pydantic model
+    
+    classify() returns a lightweight ClassifierResult; use this variant where the
+    result leaves the system (e.g. an API response).
+    
+    Args:
+        ticket: The ticket data containing id, subject, message, etc.
         
-        # Simple keyword-based classification logic
-        subject = ticket.get('subject', '').lower()
-        message = ticket.get('message', '').lower()
-        combined_text = subject + ' ' + message
+    Returns:
+        Validated ClassifierResultModel with category and reasoning
+    """
+    return classify(ticket).to_pydantic()
+
+
+def classify_batch(tickets: List[Dict[str, Any]]) -> List[ClassifierResult]:
+    """Classify several tickets at once
+    
+    Joins the text of every ticket into one string and scans it with a
+    single pass of the automaton, which is cheaper than calling classify()
+    once per ticket.
+    
+    Args:
+        tickets: List of ticket data dicts
         
-        # Determine category based on keywords
-        if any(word in combined_text for word in ['crash', 'error', 'bug', 'fix', 'broken', 'not working']):
-            category = "bug"
-            reasoning = "The ticket mentions software issues, errors or crashes."
-        elif any(word in combined_text for word in ['feature', 'add', 'new', 'improve', 'enhancement', 'suggestion']):
-            category = "feature request"
-            reasoning = "The ticket requests new functionality or improvements."
-        elif any(word in combined_text for word in ['bill', 'payment', 'charge', 'subscription', 'price', 'refund', 'credit']):
-            category = "billing issue"
-            reasoning = "The ticket relates to billing, payments, or pricing concerns."
-        else:
-            category = "general complaint"
-            reasoning = "The ticket contains general feedback that doesn't fit other categories."
+    Returns:
+        List of ClassifierResult, in the same order as the tickets
+    """
+    texts = [_ticket_text(ticket) for ticket in tickets]
+    
+    # Start offset of each ticket's text in the joined string. No keyword
+    # contains the separator, so a match never spans two tickets.
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    
+    best_ranks = [len(CATEGORY_KEYWORDS)] * len(texts)
+    for end_index, (rank, _) in _AUTOMATON.iter("\0".join(texts)):
+        row = bisect_right(starts, end_index) - 1
+        if rank < best_ranks[row]:
+            best_ranks[row] = rank
+    
+    categories: List[Category] = [category for category, _ in CATEGORY_KEYWORDS] + [GENERAL_COMPLAINT]
+    return [
+        ClassifierResult(
+            category=categories[rank],
+            reasoning=CATEGORY_REASONING[categories[rank]]
+        )
+        for rank in best_ranks
+    ]
+
+
+def normalize_ticket(ticket: Dict[str, Any]) -> Dict[str, Any]:
+    """Store the lowercased text the agents match against on a ticket
+    
+    Ticket loaders call this once per ticket, so the classifier and priority
+    agents (and the generated analyze()) don't lowercase the subject and
+    message again.
+    
+    Args:
+        ticket: The ticket data; gains '_text_lc' (subject and message) and
+            '_message_lc' (message only) fields
         
-        # Return a properly structured result
-        return ClassifierResult(
-            category=category,
-            reasoning=reasoning
-        )
\ No newline at end of file
+    Returns:
+        The same ticket dict
+    """
+    ticket['_text_lc'] = (ticket.get('subject', '') + ' ' + ticket.get('message', '')).lower()
+    ticket['_message_lc'] = ticket.get('message', '').lower()
+    return ticket
+
+
+def _ticket_text(ticket: Dict[str, Any]) -> str:
+    """Return the lowercased subject and message the keywords are matched against"""
+    text = ticket.get('_text_lc')
+    if text is None:
+        text = (ticket.get('subject', '') + ' ' + ticket.get('message', '')).lower()
+    return text
+
+
+class ClassifierAgent:
+    """Agent that classifies customer support tickets into categories
+    
+    Kept for callers that still construct an agent; the methods delegate
+    to the module-level functions above.
+    """
+    
+    @staticmethod
+    def classify(ticket: Dict[str, Any]) -> ClassifierResult:
+        """See classify()"""
+        return classify(ticket)
+    
+    @staticmethod
+    def classify_validated(ticket: Dict[str, Any]) -> ClassifierResultModel:
+        """See classify_validated()"""
+        return classify_validated(ticket)
+    
+    @staticmethod
+    def classify_batch(tickets: List[Dict[str, Any]]) -> List[ClassifierResult]:
+        """See classify_batch()"""
+        return classify_batch(tickets)
\ No newline at end of file
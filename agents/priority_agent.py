@@ -6,141 +6,272 @@ Responsible for evaluating the priority/urgency of customer support tickets
 based on multiple factors including customer tier, revenue, sentiment, etc.
 """
 
-from typing import Dict, Any, Literal
-from pydantic import BaseModel, Field
+import re
+from bisect import bisect_left, bisect_right
+from enum import IntEnum
+from functools import lru_cache
+from typing import Dict, Any, List
 
+from models import HIGH, LOW, MEDIUM, URGENT, PriorityLevel, PriorityResult, PriorityResultModel
 
-class PriorityResult(BaseModel):
-    """Result of the priority agent's evaluation"""
-    priority_level: Literal["low", "medium", "high", "urgent"] = Field(
-        ...,
-        description="The priority level assigned to the ticket"
-    )
-    reasoning: str = Field(
-        ...,
-        description="Explanation of why this priority level was assigned"
-    )
 
+# Words in the message that signal an urgent request. Matched as plain
+# substrings of the lowercased message, in a single scan. The message is
+# lowercased with str.lower() rather than matched with re.IGNORECASE, whose
+# case folding differs for some non-ASCII letters.
+URGENT_WORDS = ['urgent', 'immediately', 'emergency', 'critical', 'asap', 'right now']
+_URGENT_RE = re.compile("|".join(re.escape(word) for word in URGENT_WORDS))
+URGENT_POINTS = 2
 
-class PriorityAgent:
-    """Agent that evaluates the priority/urgency of customer support tickets"""
+# Revenue adds one point for each of these thresholds it exceeds
+REVENUE_THRESHOLDS = [10000, 50000, 100000]
+
+
+class Tier(IntEnum):
+    """Customer tier; the value is the number of priority points it adds"""
+    STANDARD = 1
+    BUSINESS = 2
+    ENTERPRISE = 3
+
+
+# Customer tier names as they appear in tickets. Matching is exact, so any
+# other value (including a differently cased name) counts as Standard.
+TIER_NAMES = {
+    'Enterprise': Tier.ENTERPRISE,
+    'Business': Tier.BUSINESS,
+    'Standard': Tier.STANDARD,
+}
+
+
+def parse_tier(customer_tier: Any) -> Tier:
+    """Parse a ticket's customer_tier value; unknown tiers count as Standard"""
+    if not isinstance(customer_tier, str):
+        return Tier.STANDARD
+    return TIER_NAMES.get(customer_tier, Tier.STANDARD)
+
+
+def _priority_score(tier: Tier, revenue: int, urgent: bool) -> int:
+    """Combine the per-ticket factors into a single priority score"""
+    score = int(tier)
     
-    def __init__(self):
-        """Initialize the priority agent"""
-        pass
+    # Add points based on revenue
+    score += bisect_left(REVENUE_THRESHOLDS, revenue)
     
-    def evaluate(self, ticket: Dict[str, Any]) -> PriorityResult:
-        """Evaluate the priority of a ticket
-        
-        Args:
-            ticket: The ticket data containing id, subject, message, customer_tier, etc.
-            
-        Returns:
-            PriorityResult with priority_level and reasoning
-        """
-        # MOCK IMPLEMENTATION
-        # For testing purposes, we're using a mock implementation instead of calling the OpenAI API
-        # This avoids API quota issues while testing
-        #
-        # To use the actual Pydantic AI implementation, replace this section with:
-        #
-        # from pydantic_ai import Agent
-        #
-        # # Create an agent for priority evaluation
-        # agent = Agent('openai:gpt-4o')
-        #
-        # # Set up the system prompt for priority evaluation
-        # system_prompt = """
-        # Evaluate the priority level of a customer support ticket based on multiple factors:
-        #
-        # 1. Customer tier (Enterprise, Business, Standard)
-        # 2. Customer revenue (annual value to the company)
-        # 3. Message sentiment and tone (urgent, angry, neutral, etc.)
-        # 4. Account age (how long they've been a customer)
-        # 5. Previous ticket history (frequency and recency)
-        #
-        # Assign one of the following priority levels:
-        # - low: Can be addressed in normal course of business
-        # - medium: Should be addressed soon but not urgent
-        # - high: Requires prompt attention
-        # - urgent: Requires immediate attention
-        #
-        # Enterprise customers and high-revenue accounts generally deserve higher priority,
-        # but also consider the actual content and context of the ticket.
-        #
-        # Provide clear reasoning for your priority assignment.
-        # """
-        #
-        # # Create a prompt from the ticket data
-        # prompt = f"""Ticket ID: {ticket.get('id', 'Unknown')}
-        # Subject: {ticket.get('subject', 'No subject')}
-        # Message: {ticket.get('message', 'No message')}
-        # Customer Tier: {ticket.get('customer_tier', 'Unknown')}
-        # Annual Revenue: ${ticket.get('revenue', 0):,}
-        # Account Age: {ticket.get('account_age', 'Unknown')} years
-        # Previous Tickets: {ticket.get('previous_tickets', 'None')}
-        #
-        # Please evaluate the priority of this ticket."""
-        #
-        # # Run the agent with the output_type set to PriorityResult
-        # result = agent.run_sync(
-        #     prompt,
-        #     system_prompt=system_prompt,
-        #     output_type=PriorityResult
-        # )
-        #
-        # # Return the structured result
-        # return result.output
-        
-        # Get ticket data
+    # Add points based on message content (simple sentiment analysis)
+    if urgent:
+        score += URGENT_POINTS
+    
+    return score
+
+
+# Minimum score for each priority level above "low"
+PRIORITY_THRESHOLDS = [3, 5, 7]
+PRIORITY_LEVELS: List[PriorityLevel] = [LOW, MEDIUM, HIGH, URGENT]
+
+PRIORITY_REASONING = {
+    URGENT: "High-value customer with urgent needs requires immediate attention.",
+    HIGH: "Important customer issue that should be addressed promptly.",
+    MEDIUM: "Standard priority issue that should be addressed in due course.",
+    LOW: "Routine issue that can be handled during normal business operations.",
+}
+
+
+def _ticket_message(ticket: Dict[str, Any]) -> str:
+    """Return the lowercased message the urgent words are matched against"""
+    message = ticket.get('_message_lc')
+    if message is None:
         message = ticket.get('message', '').lower()
-        customer_tier = ticket.get('customer_tier', 'Standard')
-        revenue = ticket.get('revenue', 0)
-        account_age = ticket.get('account_age', 0)
-        previous_tickets = ticket.get('previous_tickets', 'None')
-        
-        # Determine priority based on rules
-        
-        # Start with a base score
-        priority_score = 0
-        
-        # Add points based on customer tier
-        if customer_tier == 'Enterprise':
-            priority_score += 3
-        elif customer_tier == 'Business':
-            priority_score += 2
-        else:  # Standard
-            priority_score += 1
+    return message
+
+
+def _ticket_columns(tickets: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Extract the fields used for scoring into parallel columns
+    
+    Args:
+        tickets: List of ticket data dicts
         
-        # Add points based on revenue
-        if revenue > 100000:
-            priority_score += 3
-        elif revenue > 50000:
-            priority_score += 2
-        elif revenue > 10000:
-            priority_score += 1
+    Returns:
+        Dict mapping each column name to a list with one entry per ticket
+    """
+    messages = [_ticket_message(ticket) for ticket in tickets]
+    
+    # Find urgent words in every message with a single regex scan. No urgent
+    # word contains the separator, so a match never spans two messages.
+    starts = []
+    offset = 0
+    for message in messages:
+        starts.append(offset)
+        offset += len(message) + 1
+    
+    urgent_flags = [False] * len(messages)
+    for match in _URGENT_RE.finditer("\0".join(messages)):
+        urgent_flags[bisect_right(starts, match.start()) - 1] = True
+    
+    return {
+        'tiers': [parse_tier(ticket.get('customer_tier', 'Standard')) for ticket in tickets],
+        'revenues': [ticket.get('revenue', 0) for ticket in tickets],
+        'urgent_flags': urgent_flags,
+    }
+
+
+@lru_cache(maxsize=1024)
+def _priority(message: str, tier: Tier, revenue: int) -> PriorityResult:
+    """Evaluate a ticket's priority from its lowercased message, customer tier and revenue
+    
+    Results are cached, so tickets with the same inputs share one
+    (immutable) PriorityResult. The priority level and reasoning always come
+    from the tables above, so the result is built without validation.
+    """
+    # Determine priority based on rules
+    priority_score = _priority_score(
+        tier,
+        revenue,
+        _URGENT_RE.search(message) is not None
+    )
+    
+    # Map score to priority level
+    priority_level = PRIORITY_LEVELS[bisect_right(PRIORITY_THRESHOLDS, priority_score)]
+    
+    return PriorityResult(
+        priority_level=priority_level,
+        reasoning=PRIORITY_REASONING[priority_level]
+    )
+
+
+def evaluate(ticket: Dict[str, Any]) -> PriorityResult:
+    """Evaluate the priority of a ticket
+    
+    Args:
+        ticket: The ticket data containing id, subject, message, customer_tier, etc.
         
-        # Add points based on message content (simple sentiment analysis)
-        urgent_words = ['urgent', 'immediately', 'emergency', 'critical', 'asap', 'right now']
-        if any(word in message for word in urgent_words):
-            priority_score += 2
+    Returns:
+        PriorityResult with priority_level and reasoning
+    """
+    # MOCK IMPLEMENTATION
+    # For testing purposes, we're using a mock implementation instead of calling the OpenAI API
+    # This avoids API quota issues while testing
+    #
+    # To use the actual Pydantic AI implementation, replace this section with:
+    #
+    # from pydantic_ai import Agent
+    #
+    # # Create an agent for priority evaluation
+    # agent = Agent('openai:gpt-4o')
+    #
+    # # Set up the system prompt for priority evaluation
+    # system_prompt = """
+    # Evaluate the priority level of a customer support ticket based on multiple factors:
+    #
+    # 1. Customer tier (Enterprise, Business, Standard)
+    # 2. Customer revenue (annual value to the company)
+    # 3. Message sentiment and tone (urgent, angry, neutral, etc.)
+    # 4. Account age (how long they've been a customer)
+    # 5. Previous ticket history (frequency and recency)
+    #
+    # Assign one of the following priority levels:
+    # - low: Can be addressed in normal course of business
+    # - medium: Should be addressed soon but not urgent
+    # - high: Requires prompt attention
+    # - urgent: Requires immediate attention
+    #
+    # Enterprise customers and high-revenue accounts generally deserve higher priority,
+    # but also consider the actual content and context of the ticket.
+    #
+    # Provide clear reasoning for your priority assignment.
+    # """
+    #
+    # # Create a prompt from the ticket data
+    # prompt = f"""Ticket ID: {ticket.get('id', 'Unknown')}
+    # Subject: {ticket.get('subject', 'No subject')}
+    # Message: {ticket.get('message', 'No message')}
+    # Customer Tier: {ticket.get('customer_tier', 'Unknown')}
+    # Annual Revenue: ${ticket.get('revenue', 0):,}
+    # Account Age: {ticket.get('account_age', 'Unknown')} years
+    # Previous Tickets: {ticket.get('previous_tickets', 'None')}
+    #
+    # Please evaluate the priority of this ticket."""
+    #
+    # # Run the agent with the output_type set to PriorityResultModel
+    # result = agent.run_sync(
+    #     prompt,
+    #     system_prompt=system_prompt,
+    #     output_type=PriorityResultModel
+    # )
+    #
+    # # Return the structured result
+    # return PriorityResult(**result.output.model_dump())
+    
+    # Simple rule-based priority evaluation
+    return _priority(
+        _ticket_message(ticket),
+        parse_tier(ticket.get('customer_tier', 'Standard')),
+        ticket.get('revenue', 0)
+    )
+
+
+def evaluate_validated(ticket: Dict[str, Any]) -> PriorityResultModel:
+    """Evaluate a ticket and return the result as a validated Pydantic model
+    
+    evaluate() returns a lightweight PriorityResult; use this variant where the
+    result leaves the system (e.g. an API response).
+    
+    Args:
+        ticket: The ticket data containing id, subject, message, customer_tier, etc.
         
-        # Map score to priority level
-        if priority_score >= 7:
-            priority_level = "urgent"
-            reasoning = "High-value customer with urgent needs requires immediate attention."
-        elif priority_score >= 5:
-            priority_level = "high"
-            reasoning = "Important customer issue that should be addressed promptly."
-        elif priority_score >= 3:
-            priority_level = "medium"
-            reasoning = "Standard priority issue that should be addressed in due course."
-        else:
-            priority_level = "low"
-            reasoning = "Routine issue that can be handled during normal business operations."
+    Returns:
+        Validated PriorityResultModel with priority_level and reasoning
+    """
+    return evaluate(ticket).to_pydantic()
+
+
+def evaluate_batch(tickets: List[Dict[str, Any]]) -> List[PriorityResult]:
+    """Evaluate the priority of several tickets at once
+    
+    Works column by column over the whole batch rather than one ticket
+    dict at a time.
+    
+    Args:
+        tickets: List of ticket data dicts
         
-        # Return a properly structured result
-        return PriorityResult(
-            priority_level=priority_level,
-            reasoning=reasoning
-        )
\ No newline at end of file
+    Returns:
+        List of PriorityResult, in the same order as the tickets
+    """
+    columns = _ticket_columns(tickets)
+    scores = [
+        _priority_score(tier, revenue, urgent)
+        for tier, revenue, urgent in zip(
+            columns['tiers'], columns['revenues'], columns['urgent_flags']
+        )
+    ]
+    
+    levels = [PRIORITY_LEVELS[bisect_right(PRIORITY_THRESHOLDS, score)] for score in scores]
+    return [
+        PriorityResult(
+            priority_level=level,
+            reasoning=PRIORITY_REASONING[level]
+        )
+        for level in levels
+    ]
+
+
+class PriorityAgent:
+    """Agent that evaluates the priority/urgency of customer support tickets
+    
+    Kept for callers that still construct an agent; the methods delegate
+    to the module-level functions above.
+    """
+    
+    @staticmethod
+    def evaluate(ticket: Dict[str, Any]) -> PriorityResult:
+        """See evaluate()"""
+        return evaluate(ticket)
+    
+    @staticmethod
+    def evaluate_validated(ticket: Dict[str, Any]) -> PriorityResultModel:
+        """See evaluate_validated()"""
+        return evaluate_validated(ticket)
+    
+    @staticmethod
+    def evaluate_batch(tickets: List[Dict[str, Any]]) -> List[PriorityResult]:
+        """See evaluate_batch()"""
+        return evaluate_batch(tickets)
\ No newline at end of file
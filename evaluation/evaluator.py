@@ -6,19 +6,32 @@ Runs all test cases and computes evaluation metrics for the
 customer support ticket analysis and routing system.
 """
 
-import json
+import argparse
+import io
 import sys
 import os
-from typing import Dict, Any, List, Tuple
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import Any, BinaryIO, Deque, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+import ijson
 
 # Add parent directory to path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents.classifier_agent import ClassifierAgent, ClassifierResult
-from agents.priority_agent import PriorityAgent, PriorityResult
+from agents.classifier_agent import ClassifierResult, classify, classify_batch, normalize_ticket
+from agents.priority_agent import PriorityResult, evaluate, evaluate_batch
 from router import Router, RoutingResult
 
 
+# Number of streamed tickets handed to the batch agent functions at a time
+BATCH_SIZE = 64
+
+# Batches queued per worker process when the evaluation is parallel
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
 # Expected results for evaluation
 EXPECTED_RESULTS = {
     "SUP-001": {
@@ -49,10 +62,37 @@ EXPECTED_RESULTS = {
 }
 
 
-def load_tickets(file_path: str) -> List[Dict[str, Any]]:
-    """Load ticket data from a JSON file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+# Correct (ticket_id, team) routing decisions, for scoring routing accuracy
+_CORRECT_PAIRS = frozenset(
+    (ticket_id, expected["team"]) for ticket_id, expected in EXPECTED_RESULTS.items()
+)
+
+
+def stream_tickets(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream ticket data from a JSON file one ticket at a time
+    
+    The file is opened right away, so a missing file raises FileNotFoundError
+    here; malformed JSON raises ijson.JSONError while iterating.
+    """
+    f = open(file_path, 'rb')
+    return _read_tickets(f)
+
+
+def _read_tickets(f: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield each normalized ticket in the top-level JSON array, closing the file at the end"""
+    with f:
+        for ticket in ijson.items(f, 'item', use_float=True):
+            yield normalize_ticket(ticket)
+
+
+def _batched(tickets: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group a stream of tickets into lists of at most size tickets"""
+    iterator = iter(tickets)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 def calculate_agent_agreement(category_results: Dict[str, ClassifierResult],
@@ -93,24 +133,26 @@ def calculate_routing_accuracy(routing_results: Dict[str, RoutingResult]) -> flo
     Returns:
         Score between 0.0 and 1.0
     """
-    correct_count = 0
     total_count = len(routing_results)
-    
-    for ticket_id, result in routing_results.items():
-        if ticket_id in EXPECTED_RESULTS:
-            expected_team = EXPECTED_RESULTS[ticket_id]["team"]
-            if result.team == expected_team:
-                correct_count += 1
+    correct_count = len(_CORRECT_PAIRS & {
+        (ticket_id, result.team) for ticket_id, result in routing_results.items()
+    })
     
     return correct_count / total_count if total_count > 0 else 0.0
 
 
 def calculate_consistency(category_results: Dict[str, ClassifierResult],
-                         priority_results: Dict[str, PriorityResult]) -> float:
+                         priority_results: Dict[str, PriorityResult],
+                         subjects: Dict[str, str]) -> float:
     """Calculate consistency of agent outputs
     
     Measures if similar tickets receive similar classifications and priorities
     
+    Args:
+        category_results: Classifier results by ticket ID
+        priority_results: Priority results by ticket ID
+        subjects: Ticket subjects by ticket ID
+    
     Returns:
         Score between 0.0 and 1.0
     """
@@ -118,7 +160,7 @@ def calculate_consistency(category_results: Dict[str, ClassifierResult],
     # receive similar classifications
     
     # Group tickets by keywords in subject
-    keyword_groups = {
+    keyword_groups: Dict[str, List[str]] = {
         "crash": [],  # For crash-related tickets
         "feature": [],  # For feature request tickets
         "billing": [],  # For billing-related tickets
@@ -126,111 +168,182 @@ def calculate_consistency(category_results: Dict[str, ClassifierResult],
         "help": []  # For general help tickets
     }
     
-    # Assign tickets to groups based on keywords in subject
+    # Assign each ticket to the first group whose keyword is in its subject
     for ticket_id in category_results:
-        subject = ticket_id.lower()
+        subject = subjects.get(ticket_id, '').lower()
         
-        if "crash" in subject:
-            keyword_groups["crash"].append(ticket_id)
-        elif "feature" in subject:
-            keyword_groups["feature"].append(ticket_id)
-        elif "billing" in subject:
-            keyword_groups["billing"].append(ticket_id)
-        elif "urgent" in subject:
-            keyword_groups["urgent"].append(ticket_id)
-        elif "help" in subject:
-            keyword_groups["help"].append(ticket_id)
+        for keyword, group in keyword_groups.items():
+            if keyword in subject:
+                group.append(ticket_id)
+                break
     
     # Count consistent classifications within each group
-    consistent_count = 0
+    consistent_count = 0.0
     total_comparisons = 0
     
     for group in keyword_groups.values():
         if len(group) <= 1:
             continue
         
-        # Check all pairs in the group
-        for i in range(len(group)):
-            for j in range(i + 1, len(group)):
-                total_comparisons += 1
-                
-                # Check if category is consistent
-                if category_results[group[i]].category == category_results[group[j]].category:
-                    consistent_count += 0.5  # Half point for category match
-                
-                # Check if priority is consistent
-                if priority_results[group[i]].priority_level == priority_results[group[j]].priority_level:
-                    consistent_count += 0.5  # Half point for priority match
+        # Count matching pairs without visiting every pair: n tickets that
+        # share a value form n * (n - 1) / 2 matching pairs
+        category_counts = Counter(category_results[ticket_id].category for ticket_id in group)
+        priority_counts = Counter(priority_results[ticket_id].priority_level for ticket_id in group)
+        
+        total_comparisons += len(group) * (len(group) - 1) // 2
+        
+        # Half point for each category match and each priority match
+        consistent_count += 0.5 * sum(n * (n - 1) // 2 for n in category_counts.values())
+        consistent_count += 0.5 * sum(n * (n - 1) // 2 for n in priority_counts.values())
     
     return consistent_count / total_comparisons if total_comparisons > 0 else 1.0
 
 
-def run_evaluation() -> Tuple[float, float, float]:
+def _process_batch(batch: List[Dict[str, Any]]) -> List[Tuple[str, str, ClassifierResult, PriorityResult, RoutingResult]]:
+    """Classify, prioritize and route a batch of tickets
+    
+    Runs in a worker process when the evaluation is parallel, so it only
+    depends on its argument.
+    
+    Returns:
+        List of (ticket_id, subject, category_result, priority_result, routing_result)
+        tuples, in the same order as the batch
+    """
+    # Initialize the router with the agent functions
+    router = Router(classify, evaluate)
+    
+    category_batch = classify_batch(batch)
+    priority_batch = evaluate_batch(batch)
+    routing_batch = router.route_batch(batch, category_batch, priority_batch)
+    
+    return [
+        (ticket.get('id', 'UNKNOWN'), ticket.get('subject', 'No subject'),
+         category_result, priority_result, routing_result)
+        for ticket, category_result, priority_result, routing_result
+        in zip(batch, category_batch, priority_batch, routing_batch)
+    ]
+
+
+def _process_in_pool(executor: Executor, batches: Iterable[List[Dict[str, Any]]],
+                     window: int) -> Iterator[List[Tuple[str, str, ClassifierResult, PriorityResult, RoutingResult]]]:
+    """Run _process_batch over batches in the executor, yielding results in order
+    
+    Unlike Executor.map, which submits every batch up front, at most window
+    batches are in flight at a time; the next batch is only read from the
+    stream once an earlier result is taken, so the ticket file is still
+    read incrementally.
+    """
+    pending: Deque[Future] = deque()
+    for batch in batches:
+        pending.append(executor.submit(_process_batch, batch))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_evaluation(workers: int = 1, buffered: bool = False) -> Tuple[float, float, float]:
     """Run evaluation on all test cases and compute metrics
     
+    Args:
+        workers: Number of worker processes; 1 processes tickets in this process
+        buffered: Collect the per-ticket output in memory and write it to
+            stdout once at the end, instead of as each ticket is processed
+    
     Returns:
         Tuple of (agent_agreement, routing_accuracy, consistency) scores
     """
-    # Initialize agents
-    classifier = ClassifierAgent()
-    priority_agent = PriorityAgent()
-    router = Router(classifier, priority_agent)
+    if not buffered:
+        return _evaluate_tickets(workers, sys.stdout)
     
+    buf = io.StringIO()
+    try:
+        return _evaluate_tickets(workers, buf)
+    finally:
+        sys.stdout.write(buf.getvalue())
+
+
+def _evaluate_tickets(workers: int, out: TextIO) -> Tuple[float, float, float]:
+    """Process the test tickets and compute metrics, writing the per-ticket results to out"""
     # Load test tickets
     try:
-        tickets = load_tickets(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                                          'test_cases', 'tickets.json'))
-        print(f"Loaded {len(tickets)} tickets for evaluation")
+        tickets = stream_tickets(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                            'test_cases', 'tickets.json'))
     except FileNotFoundError:
-        print("Error: test_cases/tickets.json not found")
-        return 0.0, 0.0, 0.0
-    except json.JSONDecodeError:
-        print("Error: Invalid JSON in test_cases/tickets.json")
+        out.write("Error: test_cases/tickets.json not found\n")
         return 0.0, 0.0, 0.0
     
     # Store results for each ticket
     category_results = {}
     priority_results = {}
     routing_results = {}
+    subjects = {}
     
-    # Process each ticket
-    for ticket in tickets:
-        ticket_id = ticket.get('id', 'UNKNOWN')
-        print(f"\nProcessing ticket {ticket_id}")
-        print(f"Subject: {ticket.get('subject', 'No subject')}")
-        
-        # Get classifications from agents
-        category_result = classifier.classify(ticket)
-        priority_result = priority_agent.evaluate(ticket)
-        
-        # Route the ticket
-        routing_result = router.route(ticket, category_result, priority_result)
-        
-        # Store results
-        category_results[ticket_id] = category_result
-        priority_results[ticket_id] = priority_result
-        routing_results[ticket_id] = routing_result
-        
-        # Display results
-        print(f"Category: {category_result.category} - {category_result.reasoning}")
-        print(f"Priority: {priority_result.priority_level} - {priority_result.reasoning}")
-        print(f"Routed to: {routing_result.team} - {routing_result.reasoning}")
-        print("-" * 50)
+    # Process tickets as they are read from the file, a batch at a time,
+    # spreading the batches over worker processes if requested. Results come
+    # back in order and are written here, in the main process.
+    ticket_count = 0
+    try:
+        batches = _batched(tickets, BATCH_SIZE)
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+            if executor is not None:
+                processed_batches = _process_in_pool(executor, batches, workers * BATCHES_IN_FLIGHT_PER_WORKER)
+            else:
+                processed_batches = map(_process_batch, batches)
+            for processed in processed_batches:
+                for ticket_id, subject, category_result, priority_result, routing_result in processed:
+                    ticket_count += 1
+                    
+                    # Store results
+                    category_results[ticket_id] = category_result
+                    priority_results[ticket_id] = priority_result
+                    routing_results[ticket_id] = routing_result
+                    subjects[ticket_id] = subject
+                    
+                    # Display results
+                    out.write(
+                        f"\nProcessing ticket {ticket_id}\n"
+                        f"Subject: {subject}\n"
+                        f"Category: {category_result.category} - {category_result.reasoning}\n"
+                        f"Priority: {priority_result.priority_level} - {priority_result.reasoning}\n"
+                        f"Routed to: {routing_result.team} - {routing_result.reasoning}\n"
+                        f"{'-' * 50}\n"
+                    )
+    except ijson.JSONError:
+        out.write("Error: Invalid JSON in test_cases/tickets.json\n")
+        return 0.0, 0.0, 0.0
+    
+    out.write(f"\nEvaluated {ticket_count} tickets\n")
     
     # Calculate metrics
     agent_agreement = calculate_agent_agreement(category_results, priority_results)
     routing_accuracy = calculate_routing_accuracy(routing_results)
-    consistency = calculate_consistency(category_results, priority_results)
+    consistency = calculate_consistency(category_results, priority_results, subjects)
     
     return agent_agreement, routing_accuracy, consistency
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be a positive integer"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def main():
     """Main function to run the evaluation"""
+    parser = argparse.ArgumentParser(description="Evaluate the customer support ticket analysis system")
+    parser.add_argument("--workers", type=_positive_int, default=1,
+                        help="Number of worker processes used to analyze tickets (default: 1)")
+    parser.add_argument("--buffered", action="store_true",
+                        help="Collect the per-ticket output in memory and write it once at the end")
+    args = parser.parse_args()
+    
     print("=== Customer Support Ticket Analysis System Evaluation ===\n")
     
     # Run evaluation
-    agent_agreement, routing_accuracy, consistency = run_evaluation()
+    agent_agreement, routing_accuracy, consistency = run_evaluation(args.workers, args.buffered)
     
     # Display results
     print("\n=== Evaluation Results ===")
@@ -4,56 +4,85 @@ Customer Support Ticket Analyzer
 Main application entry point
 """
 
-import json
-from typing import List, Dict, Any
+import argparse
+import io
+import sys
+from typing import Any, BinaryIO, Dict, Iterator, TextIO
 
-from agents.classifier_agent import ClassifierAgent
-from agents.priority_agent import PriorityAgent
-from router import Router
+import ijson
 
+from agents.classifier_agent import normalize_ticket
+from router import analyze
 
-def load_tickets(file_path: str) -> List[Dict[str, Any]]:
-    """Load ticket data from a JSON file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
 
-
-def main():
-    """Main application entry point"""
-    # Initialize agents
-    classifier = ClassifierAgent()
-    priority_agent = PriorityAgent()
-    router = Router(classifier, priority_agent)
+def stream_tickets(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream ticket data from a JSON file one ticket at a time
     
+    The file is opened right away, so a missing file raises FileNotFoundError
+    here; malformed JSON raises ijson.JSONError while iterating.
+    """
+    f = open(file_path, 'rb')
+    return _read_tickets(f)
+
+
+def _read_tickets(f: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield each normalized ticket in the top-level JSON array, closing the file at the end"""
+    with f:
+        for ticket in ijson.items(f, 'item', use_float=True):
+            yield normalize_ticket(ticket)
+
+
+def analyze_tickets(out: TextIO) -> None:
+    """Analyze the test tickets, writing the results to out"""
     # Load test tickets
     try:
-        tickets = load_tickets('test_cases/tickets.json')
-        print(f"Loaded {len(tickets)} tickets for processing")
+        tickets = stream_tickets('test_cases/tickets.json')
     except FileNotFoundError:
-        print("Error: test_cases/tickets.json not found")
+        out.write("Error: test_cases/tickets.json not found\n")
         return
-    except json.JSONDecodeError:
-        print("Error: Invalid JSON in test_cases/tickets.json")
+    
+    # Process each ticket as it is read from the file
+    ticket_count = 0
+    try:
+        for ticket in tickets:
+            ticket_count += 1
+            
+            # Classify, prioritize and route the ticket in one call
+            category, priority_level, team, (category_reasoning, priority_reasoning, _) = analyze(ticket)
+            
+            # Display results
+            out.write(
+                f"\nProcessing ticket {ticket.get('id', 'UNKNOWN')}\n"
+                f"Subject: {ticket.get('subject', 'No subject')}\n"
+                f"Category: {category} - {category_reasoning}\n"
+                f"Priority: {priority_level} - {priority_reasoning}\n"
+                f"Routed to: {team}\n"
+                f"{'-' * 50}\n"
+            )
+    except ijson.JSONError:
+        out.write("Error: Invalid JSON in test_cases/tickets.json\n")
         return
     
-    # Process each ticket
-    for ticket in tickets:
-        print(f"\nProcessing ticket {ticket.get('id', 'UNKNOWN')}")
-        print(f"Subject: {ticket.get('subject', 'No subject')}")
-        
-        # Get classifications from agents
-        category_result = classifier.classify(ticket)
-        priority_result = priority_agent.evaluate(ticket)
-        
-        # Route the ticket
-        routing_result = router.route(ticket, category_result, priority_result)
-        
-        # Display results
-        print(f"Category: {category_result.category} - {category_result.reasoning}")
-        print(f"Priority: {priority_result.priority_level} - {priority_result.reasoning}")
-        print(f"Routed to: {routing_result.team}")
-        print("-" * 50)
+    out.write(f"\nProcessed {ticket_count} tickets\n")
+
+
+def main():
+    """Main application entry point"""
+    parser = argparse.ArgumentParser(description="Analyze and route the test customer support tickets")
+    parser.add_argument("--buffered", action="store_true",
+                        help="Collect all output in memory and write it once at the end")
+    args = parser.parse_args()
+    
+    if not args.buffered:
+        analyze_tickets(sys.stdout)
+        return
+    
+    buf = io.StringIO()
+    try:
+        analyze_tickets(buf)
+    finally:
+        sys.stdout.write(buf.getvalue())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
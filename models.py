@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Result Models
+
+Result types for the classifier agent, the priority agent and the router.
+
+The agents and router pass lightweight, immutable NamedTuples between
+each other. Each one converts to a matching Pydantic model with
+to_pydantic() where a validated, serializable result is needed (e.g. an
+API response, or the output_type of a Pydantic AI agent).
+
+These live in their own module, outside the set compiled by mypyc (see
+setup.py): mypyc erases the Literal annotations on compiled classes, which
+Pydantic needs to build its validators.
+"""
+
+import sys
+from typing import Literal, NamedTuple, TypeVar, cast
+from pydantic import BaseModel, ConfigDict, Field
+
+
+Category = Literal["bug", "feature request", "billing issue", "general complaint"]
+PriorityLevel = Literal["low", "medium", "high", "urgent"]
+Team = Literal["Escalation Team", "Product Team", "Finance Support", "General Support"]
+
+_S = TypeVar("_S", bound=str)
+
+
+def _intern(value: _S) -> _S:
+    """Return the interned copy of a string, keeping its Literal type"""
+    return cast(_S, sys.intern(value))
+
+
+# Canonical category, priority and team strings. They are interned once
+# here and every result is built from these instances, so equality checks
+# between them (e.g. in the router) hit CPython's identity fast path.
+BUG: Category = _intern("bug")
+FEATURE_REQUEST: Category = _intern("feature request")
+BILLING_ISSUE: Category = _intern("billing issue")
+GENERAL_COMPLAINT: Category = _intern("general complaint")
+
+LOW: PriorityLevel = _intern("low")
+MEDIUM: PriorityLevel = _intern("medium")
+HIGH: PriorityLevel = _intern("high")
+URGENT: PriorityLevel = _intern("urgent")
+
+ESCALATION_TEAM: Team = _intern("Escalation Team")
+PRODUCT_TEAM: Team = _intern("Product Team")
+FINANCE_SUPPORT: Team = _intern("Finance Support")
+GENERAL_SUPPORT: Team = _intern("General Support")
+
+
+class ClassifierResultModel(BaseModel):
+    """Validated result of the classifier agent's analysis"""
+    model_config = ConfigDict(frozen=True)
+    
+    category: Category = Field(
+        ...,
+        description="The category of the ticket"
+    )
+    reasoning: str = Field(
+        ...,
+        description="Explanation of why this category was chosen"
+    )
+
+
+class PriorityResultModel(BaseModel):
+    """Validated result of the priority agent's evaluation"""
+    model_config = ConfigDict(frozen=True)
+    
+    priority_level: PriorityLevel = Field(
+        ...,
+        description="The priority level assigned to the ticket"
+    )
+    reasoning: str = Field(
+        ...,
+        description="Explanation of why this priority level was assigned"
+    )
+
+
+class RoutingResultModel(BaseModel):
+    """Validated result of the routing decision"""
+    model_config = ConfigDict(frozen=True)
+    
+    team: Team = Field(
+        ...,
+        description="The team that should handle this ticket"
+    )
+    reasoning: str = Field(
+        ...,
+        description="Explanation of why this team was chosen"
+    )
+
+
+class ClassifierResult(NamedTuple):
+    """Result of the classifier agent's analysis"""
+    category: Category
+    reasoning: str
+    
+    def to_pydantic(self) -> ClassifierResultModel:
+        """Convert to the validated Pydantic model"""
+        return ClassifierResultModel(category=self.category, reasoning=self.reasoning)
+
+
+class PriorityResult(NamedTuple):
+    """Result of the priority agent's evaluation"""
+    priority_level: PriorityLevel
+    reasoning: str
+    
+    def to_pydantic(self) -> PriorityResultModel:
+        """Convert to the validated Pydantic model"""
+        return PriorityResultModel(priority_level=self.priority_level, reasoning=self.reasoning)
+
+
+class RoutingResult(NamedTuple):
+    """Result of the routing decision"""
+    team: Team
+    reasoning: str
+    
+    def to_pydantic(self) -> RoutingResultModel:
+        """Convert to the validated Pydantic model"""
+        return RoutingResultModel(team=self.team, reasoning=self.reasoning)
@@ -6,37 +6,85 @@ Combines the outputs of the classifier and priority agents to determine
 the appropriate team for handling each customer support ticket.
 """
 
-from typing import Dict, Any, Literal
-from pydantic import BaseModel, Field
+from typing import Dict, Any, Callable, List, Tuple
 
-from agents.classifier_agent import ClassifierAgent, ClassifierResult
-from agents.priority_agent import PriorityAgent, PriorityResult
+from agents.classifier_agent import CATEGORY_KEYWORDS, CATEGORY_REASONING, classify
+from agents.priority_agent import (
+    PRIORITY_LEVELS, PRIORITY_REASONING, PRIORITY_THRESHOLDS, REVENUE_THRESHOLDS,
+    TIER_NAMES, URGENT_POINTS, URGENT_WORDS, Tier, evaluate
+)
+from models import (
+    BILLING_ISSUE, BUG, ESCALATION_TEAM, FEATURE_REQUEST, FINANCE_SUPPORT, GENERAL_COMPLAINT,
+    GENERAL_SUPPORT, HIGH, LOW, MEDIUM, PRODUCT_TEAM, URGENT, ClassifierResult, PriorityResult, RoutingResult, Team
+)
 
 
-class RoutingResult(BaseModel):
-    """Result of the routing decision"""
-    team: Literal["Escalation Team", "Product Team", "Finance Support", "General Support"] = Field(
-        ...,
-        description="The team that should handle this ticket"
-    )
-    reasoning: str = Field(
-        ...,
-        description="Explanation of why this team was chosen"
-    )
+# Reasoning for escalated tickets, keyed by (is_urgent, is_enterprise_bug)
+_ESCALATION_REASONS = {
+    (True, True): "Routed to Escalation Team because the ticket is marked as urgent "
+                  "and it's a bug from an enterprise customer",
+    (True, False): "Routed to Escalation Team because the ticket is marked as urgent",
+    (False, True): "Routed to Escalation Team because it's a bug from an enterprise customer",
+}
+
+# Team and reasoning for tickets that are not escalated, by category
+_CATEGORY_ROUTES: Dict[str, Tuple[Team, str]] = {
+    FEATURE_REQUEST: (
+        PRODUCT_TEAM,
+        "Routed to Product Team because the ticket is categorized as a feature request"
+    ),
+    BILLING_ISSUE: (
+        FINANCE_SUPPORT,
+        "Routed to Finance Support because the ticket is categorized as a billing issue"
+    ),
+}
+_DEFAULT_ROUTE: Tuple[Team, str] = (
+    GENERAL_SUPPORT,
+    "Routed to General Support as it doesn't meet criteria for specialized teams"
+)
+
+# Lowercase name of the tier whose bugs are escalated
+_ENTERPRISE = Tier.ENTERPRISE.name.lower()
+
+# Every possible routing outcome, built once. Results are immutable, so
+# route() and route_batch() hand out these shared instances.
+_ESCALATION_RESULTS = {
+    key: RoutingResult(team=ESCALATION_TEAM, reasoning=reasoning)
+    for key, reasoning in _ESCALATION_REASONS.items()
+}
+_CATEGORY_RESULTS = {
+    category: RoutingResult(team=team, reasoning=reasoning)
+    for category, (team, reasoning) in _CATEGORY_ROUTES.items()
+}
+_DEFAULT_RESULT = RoutingResult(team=_DEFAULT_ROUTE[0], reasoning=_DEFAULT_ROUTE[1])
+
+
+def _is_enterprise(customer_tier: str) -> bool:
+    """Check for an enterprise customer; unlike the priority agent, the router ignores case"""
+    return customer_tier.lower() == _ENTERPRISE
+
+
+def _select_route(category: str, is_urgent: bool, is_enterprise_bug: bool) -> RoutingResult:
+    """Apply the routing rules to a ticket's category and escalation flags"""
+    if is_urgent or is_enterprise_bug:
+        return _ESCALATION_RESULTS[(is_urgent, is_enterprise_bug)]
+    return _CATEGORY_RESULTS.get(category, _DEFAULT_RESULT)
 
 
 class Router:
     """Routes customer support tickets to the appropriate team"""
     
-    def __init__(self, classifier: ClassifierAgent, priority_agent: PriorityAgent):
-        """Initialize the router with the classifier and priority agents
+    def __init__(self,
+                 classify: Callable[[Dict[str, Any]], ClassifierResult] = classify,
+                 evaluate: Callable[[Dict[str, Any]], PriorityResult] = evaluate):
+        """Initialize the router with the classifier and priority agent functions
         
         Args:
-            classifier: The classifier agent
-            priority_agent: The priority agent
+            classify: The classifier agent function
+            evaluate: The priority agent function
         """
-        self.classifier = classifier
-        self.priority_agent = priority_agent
+        self.classify = classify
+        self.evaluate = evaluate
     
     def route(self, ticket: Dict[str, Any], 
               category_result: ClassifierResult, 
@@ -53,31 +101,178 @@ class Router:
         """
         # Extract relevant information
         category = category_result.category
-        priority = priority_result.priority_level
-        customer_tier = ticket.get("customer_tier", "").lower()
+        is_urgent = priority_result.priority_level == URGENT
+        is_enterprise_bug = category == BUG and _is_enterprise(ticket.get("customer_tier", ""))
         
         # Apply routing rules
-        if (priority == "urgent" or 
-                (category == "bug" and customer_tier == "enterprise")):
-            team = "Escalation Team"
-            reasoning = f"Routed to Escalation Team because "
-            if priority == "urgent":
-                reasoning += f"the ticket is marked as {priority}"
-                if category == "bug" and customer_tier == "enterprise":
-                    reasoning += " and "
-            if category == "bug" and customer_tier == "enterprise":
-                reasoning += f"it's a {category} from an {customer_tier} customer"
-        
-        elif category == "feature request":
-            team = "Product Team"
-            reasoning = f"Routed to Product Team because the ticket is categorized as a {category}"
+        return _select_route(category, is_urgent, is_enterprise_bug)
+    
+    def route_batch(self, tickets: List[Dict[str, Any]],
+                    category_results: List[ClassifierResult],
+                    priority_results: List[PriorityResult]) -> List[RoutingResult]:
+        """Route several tickets at once
         
-        elif category == "billing issue":
-            team = "Finance Support"
-            reasoning = f"Routed to Finance Support because the ticket is categorized as a {category}"
+        Builds the category and escalation-flag columns for the whole batch,
+        then selects each ticket's route from the precomputed results.
         
-        else:
-            team = "General Support"
-            reasoning = f"Routed to General Support as it doesn't meet criteria for specialized teams"
+        Args:
+            tickets: List of ticket data dicts
+            category_results: The classifier results, in the same order
+            priority_results: The priority results, in the same order
+            
+        Returns:
+            List of RoutingResult, in the same order as the tickets
+        """
+        categories = [result.category for result in category_results]
+        urgent_flags = [result.priority_level == URGENT for result in priority_results]
+        enterprise_bug_flags = [
+            category == BUG and _is_enterprise(ticket.get("customer_tier", ""))
+            for ticket, category in zip(tickets, categories)
+        ]
         
-        return RoutingResult(team=team, reasoning=reasoning)
\ No newline at end of file
+        return [
+            _select_route(category, is_urgent, is_enterprise_bug)
+            for category, is_urgent, is_enterprise_bug in zip(categories, urgent_flags, enterprise_bug_flags)
+        ]
+
+
+# Category, priority and team strings the generated analyze() refers to by
+# name, so that it returns the interned instances from models rather than
+# its own copies of the literals
+_ANALYZE_GLOBALS: Dict[str, str] = {
+    "BUG": BUG,
+    "FEATURE_REQUEST": FEATURE_REQUEST,
+    "BILLING_ISSUE": BILLING_ISSUE,
+    "GENERAL_COMPLAINT": GENERAL_COMPLAINT,
+    "LOW": LOW,
+    "MEDIUM": MEDIUM,
+    "HIGH": HIGH,
+    "URGENT": URGENT,
+    "ESCALATION_TEAM": ESCALATION_TEAM,
+    "PRODUCT_TEAM": PRODUCT_TEAM,
+    "FINANCE_SUPPORT": FINANCE_SUPPORT,
+    "GENERAL_SUPPORT": GENERAL_SUPPORT,
+}
+_ANALYZE_GLOBAL_NAMES = {value: name for name, value in _ANALYZE_GLOBALS.items()}
+
+
+def _source(value: str) -> str:
+    """Return a source expression for a result string, by name if models defines it"""
+    return _ANALYZE_GLOBAL_NAMES.get(value, repr(value))
+
+
+def _any_in(keywords: List[str], text_var: str) -> str:
+    """Return a source expression testing whether any keyword is in text_var"""
+    return " or ".join(f"{keyword!r} in {text_var}" for keyword in keywords)
+
+
+def _generate_analyze_source() -> str:
+    """Generate the source of the fused analyze() function
+    
+    The classifier keywords, priority scoring rules and routing tables are
+    written into the function body as constants, so analyze() runs all
+    three stages as one flat if/elif ladder without building intermediate
+    result models. Category, priority and team strings are referenced by
+    the names in _ANALYZE_GLOBALS.
+    """
+    lines = [
+        "def analyze(ticket):",
+        "    text = ticket.get('_text_lc')",
+        "    if text is None:",
+        "        text = (ticket.get('subject', '') + ' ' + ticket.get('message', '')).lower()",
+        "",
+        "    # Classify",
+    ]
+    keyword = "if"
+    for category, keywords in CATEGORY_KEYWORDS:
+        lines += [
+            f"    {keyword} {_any_in(keywords, 'text')}:",
+            f"        category = {_source(category)}",
+            f"        category_reasoning = {CATEGORY_REASONING[category]!r}",
+        ]
+        keyword = "elif"
+    lines += [
+        "    else:",
+        f"        category = {_source(GENERAL_COMPLAINT)}",
+        f"        category_reasoning = {CATEGORY_REASONING[GENERAL_COMPLAINT]!r}",
+        "",
+        "    # Prioritize",
+        "    tier = ticket.get('customer_tier', 'Standard')",
+    ]
+    keyword = "if"
+    for name, tier in sorted(TIER_NAMES.items(), key=lambda item: item[1], reverse=True):
+        if tier is Tier.STANDARD:
+            continue
+        lines += [
+            f"    {keyword} tier == {name!r}:",
+            f"        score = {int(tier)}",
+        ]
+        keyword = "elif"
+    lines += [
+        "    else:",
+        f"        score = {int(Tier.STANDARD)}",
+        "    revenue = ticket.get('revenue', 0)",
+    ]
+    keyword = "if"
+    for points, threshold in sorted(enumerate(REVENUE_THRESHOLDS, 1), reverse=True):
+        lines += [
+            f"    {keyword} revenue > {threshold!r}:",
+            f"        score += {points}",
+        ]
+        keyword = "elif"
+    lines += [
+        "    message = ticket.get('_message_lc')",
+        "    if message is None:",
+        "        message = ticket.get('message', '').lower()",
+        f"    if {_any_in(URGENT_WORDS, 'message')}:",
+        f"        score += {URGENT_POINTS}",
+    ]
+    keyword = "if"
+    for threshold, level in sorted(zip(PRIORITY_THRESHOLDS, PRIORITY_LEVELS[1:]), reverse=True):
+        lines += [
+            f"    {keyword} score >= {threshold}:",
+            f"        priority_level = {_source(level)}",
+            f"        priority_reasoning = {PRIORITY_REASONING[level]!r}",
+        ]
+        keyword = "elif"
+    lines += [
+        "    else:",
+        f"        priority_level = {_source(PRIORITY_LEVELS[0])}",
+        f"        priority_reasoning = {PRIORITY_REASONING[PRIORITY_LEVELS[0]]!r}",
+        "",
+        "    # Route",
+        f"    is_urgent = priority_level == {_source(URGENT)}",
+        f"    is_enterprise_bug = category == {_source(BUG)} and tier.lower() == {_ENTERPRISE!r}",
+        "    if is_urgent and is_enterprise_bug:",
+        f"        team, routing_reasoning = {_source(ESCALATION_TEAM)}, {_ESCALATION_REASONS[(True, True)]!r}",
+        "    elif is_urgent:",
+        f"        team, routing_reasoning = {_source(ESCALATION_TEAM)}, {_ESCALATION_REASONS[(True, False)]!r}",
+        "    elif is_enterprise_bug:",
+        f"        team, routing_reasoning = {_source(ESCALATION_TEAM)}, {_ESCALATION_REASONS[(False, True)]!r}",
+    ]
+    for routed_category, route in _CATEGORY_ROUTES.items():
+        lines += [
+            f"    elif category == {_source(routed_category)}:",
+            f"        team, routing_reasoning = {_source(route[0])}, {route[1]!r}",
+        ]
+    lines += [
+        "    else:",
+        f"        team, routing_reasoning = {_source(_DEFAULT_ROUTE[0])}, {_DEFAULT_ROUTE[1]!r}",
+        "",
+        "    return category, priority_level, team, (category_reasoning, priority_reasoning, routing_reasoning)",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _build_analyze() -> Callable[[Dict[str, Any]], Tuple[str, str, str, Tuple[str, str, str]]]:
+    """Compile the generated analyze() function"""
+    namespace: Dict[str, Any] = dict(_ANALYZE_GLOBALS)
+    exec(compile(_generate_analyze_source(), "<generated analyze>", "exec"), namespace)
+    return namespace["analyze"]
+
+
+# Classify, prioritize and route a ticket in one call. Returns
+# (category, priority_level, team, (category_reasoning, priority_reasoning,
+# routing_reasoning)), matching what classify(), evaluate() and
+# Router.route() would produce for the same ticket.
+analyze = _build_analyze()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Build script for the ticket analysis pipeline, with optional mypyc compilation
+
+The agents, router and evaluator are plain, fully annotated Python, so
+mypyc can compile them ahead of time into C extensions. Compilation is
+opt-in: set TICKET_ANALYZER_USE_MYPYC=1 (this needs mypy and a C compiler)
+and build them in place with:
+
+    TICKET_ANALYZER_USE_MYPYC=1 python setup.py build_ext --inplace
+
+Python picks up the compiled modules automatically on the next import.
+Delete the generated .so files to go back to the pure Python sources.
+
+Without the variable, pip install . installs the pure Python sources.
+"""
+
+import os
+
+from setuptools import setup
+
+
+ext_modules = []
+if os.environ.get("TICKET_ANALYZER_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify([
+        "--ignore-missing-imports",
+        "agents/classifier_agent.py",
+        "agents/priority_agent.py",
+        "router.py",
+        "evaluation/evaluator.py",
+    ])
+
+
+setup(
+    name="customer-support-ticket-analyzer",
+    packages=["agents", "evaluation"],
+    py_modules=["models", "router"],
+    install_requires=[
+        "pydantic>=2.0.0",
+        "pyahocorasick>=2.0.0",
+        "ijson>=3.1",
+    ],
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,98 @@
+"""
+Tests for calculate_consistency in the evaluator
+"""
+
+from models import BUG, FEATURE_REQUEST, GENERAL_COMPLAINT, HIGH, LOW, MEDIUM, ClassifierResult, PriorityResult
+from evaluation.evaluator import calculate_consistency
+
+
+# Subjects of the bundled test tickets (test_cases/tickets.json)
+SUBJECTS = {
+    'SUP-001': "Application crashes when uploading large files",
+    'SUP-002': "Feature request: Dark mode",
+    'SUP-003': "Billing discrepancy on latest invoice",
+    'SUP-004': "URGENT: Service completely down",
+    'SUP-005': "Confused about how to use the export feature",
+}
+
+
+def _results(values: dict) -> tuple:
+    """Build classifier and priority results from {ticket_id: (category, priority_level)}"""
+    category_results = {ticket_id: ClassifierResult(category, "") for ticket_id, (category, _) in values.items()}
+    priority_results = {ticket_id: PriorityResult(level, "") for ticket_id, (_, level) in values.items()}
+    return category_results, priority_results
+
+
+def _pairwise_consistency(category_results: dict, priority_results: dict, groups: list) -> float:
+    """Reference implementation: compare every pair of tickets within each group"""
+    consistent_count = 0.0
+    total_comparisons = 0
+    for group in groups:
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                total_comparisons += 1
+                if category_results[group[i]].category == category_results[group[j]].category:
+                    consistent_count += 0.5
+                if priority_results[group[i]].priority_level == priority_results[group[j]].priority_level:
+                    consistent_count += 0.5
+    return consistent_count / total_comparisons if total_comparisons > 0 else 1.0
+
+
+def test_feature_tickets_form_a_group():
+    # Only SUP-002 and SUP-005 share a keyword group ('feature'), so their
+    # results alone decide the score
+    values = {
+        'SUP-001': (BUG, HIGH),
+        'SUP-002': (FEATURE_REQUEST, LOW),
+        'SUP-003': (GENERAL_COMPLAINT, MEDIUM),
+        'SUP-004': (GENERAL_COMPLAINT, HIGH),
+        'SUP-005': (FEATURE_REQUEST, LOW),
+    }
+    assert calculate_consistency(*_results(values), SUBJECTS) == 1.0
+    
+    values['SUP-005'] = (GENERAL_COMPLAINT, LOW)
+    assert calculate_consistency(*_results(values), SUBJECTS) == 0.5
+    
+    values['SUP-005'] = (GENERAL_COMPLAINT, MEDIUM)
+    assert calculate_consistency(*_results(values), SUBJECTS) == 0.0
+
+
+def test_ticket_joins_only_first_matching_group():
+    # 'A' mentions both 'crash' and 'feature' but only joins the crash group,
+    # so it is never compared with 'B'
+    subjects = {
+        'A': "Crash after using the new feature",
+        'B': "Feature idea",
+        'C': "Crash on startup",
+    }
+    values = {
+        'A': (BUG, HIGH),
+        'B': (FEATURE_REQUEST, LOW),
+        'C': (BUG, HIGH),
+    }
+    assert calculate_consistency(*_results(values), subjects) == 1.0
+
+
+def test_no_groups_scores_one():
+    values = {'SUP-001': (BUG, HIGH), 'SUP-002': (FEATURE_REQUEST, LOW)}
+    assert calculate_consistency(*_results(values), SUBJECTS) == 1.0
+
+
+def test_matches_pairwise_reference():
+    subjects = {
+        'T1': "crash on login", 'T2': "crash on save", 'T3': "crash again", 'T4': "crash!",
+        'T5': "billing question", 'T6': "billing error", 'T7': "billing",
+        'T8': "need help", 'T9': "help please",
+        'T10': "feature idea",
+    }
+    values = {
+        'T1': (BUG, HIGH), 'T2': (BUG, HIGH), 'T3': (BUG, MEDIUM), 'T4': (GENERAL_COMPLAINT, HIGH),
+        'T5': (GENERAL_COMPLAINT, LOW), 'T6': (BUG, LOW), 'T7': (GENERAL_COMPLAINT, MEDIUM),
+        'T8': (GENERAL_COMPLAINT, LOW), 'T9': (GENERAL_COMPLAINT, LOW),
+        'T10': (FEATURE_REQUEST, LOW),
+    }
+    groups = [['T1', 'T2', 'T3', 'T4'], ['T5', 'T6', 'T7'], ['T8', 'T9']]
+    category_results, priority_results = _results(values)
+    
+    expected = _pairwise_consistency(category_results, priority_results, groups)
+    assert calculate_consistency(category_results, priority_results, subjects) == expected
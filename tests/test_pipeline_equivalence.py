@@ -0,0 +1,114 @@
+"""
+Equivalence tests for the three copies of the analysis rules
+
+The per-ticket functions (classify, evaluate, Router.route), the batch
+functions (classify_batch, evaluate_batch, Router.route_batch) and the
+generated analyze() implement the same rules separately. These tests check
+that they agree on randomly generated tickets.
+"""
+
+import random
+
+import pytest
+
+from agents.classifier_agent import classify, classify_batch, normalize_ticket
+from agents.priority_agent import Tier, evaluate, evaluate_batch, parse_tier
+from router import Router, analyze
+
+
+WORDS = [
+    'crash', 'Error', 'bug', 'fix', 'broken', 'not working',
+    'feature', 'ADD', 'new', 'improve', 'enhancement', 'suggestion',
+    'bill', 'payment', 'charge', 'subscription', 'price', 'refund', 'credit',
+    'urgent', 'Immediately', 'emergency', 'critical', 'ASAP', 'right now',
+    'hello', 'please', 'thanks', 'address', 'crashes',
+    # Non-ASCII letters whose case folding differs between str.lower()
+    # and re.IGNORECASE
+    'crıtical', 'CRİTICAL', 'aſap', 'ΣOS',
+]
+TIERS = ['Enterprise', 'Business', 'Standard', 'enterprise', 'ENTERPRISE', 'business', '']
+REVENUES = [0, 10000, 10001, 50000, 50001, 100000, 100001, 250000]
+
+
+def _raw_ticket(rng: random.Random) -> dict:
+    return {
+        'id': f"T{rng.randint(0, 99)}",
+        'subject': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 4))),
+        'message': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 8))),
+        'customer_tier': rng.choice(TIERS),
+        'revenue': rng.choice(REVENUES),
+    }
+
+
+def _random_ticket(rng: random.Random) -> dict:
+    ticket = _raw_ticket(rng)
+    return normalize_ticket(ticket) if rng.random() < 0.5 else ticket
+
+
+def _analyze_separately(router: Router, ticket: dict) -> tuple:
+    category_result = classify(ticket)
+    priority_result = evaluate(ticket)
+    routing_result = router.route(ticket, category_result, priority_result)
+    return (category_result.category, priority_result.priority_level, routing_result.team,
+            (category_result.reasoning, priority_result.reasoning, routing_result.reasoning))
+
+
+def test_analyze_matches_agents_and_router():
+    rng = random.Random(0)
+    router = Router()
+    for _ in range(20000):
+        ticket = _random_ticket(rng)
+        assert analyze(ticket) == _analyze_separately(router, ticket), ticket
+
+
+def test_batch_matches_single_ticket():
+    rng = random.Random(1)
+    router = Router()
+    for _ in range(500):
+        tickets = [_random_ticket(rng) for _ in range(rng.randint(0, 40))]
+        category_results = classify_batch(tickets)
+        priority_results = evaluate_batch(tickets)
+        routing_results = router.route_batch(tickets, category_results, priority_results)
+        
+        assert category_results == [classify(ticket) for ticket in tickets]
+        assert priority_results == [evaluate(ticket) for ticket in tickets]
+        assert routing_results == [
+            router.route(ticket, category_result, priority_result)
+            for ticket, category_result, priority_result in zip(tickets, category_results, priority_results)
+        ]
+
+
+def test_normalized_and_raw_tickets_agree():
+    # normalize_ticket() stores '_text_lc' and '_message_lc'; every path
+    # must give the same result as when it lowercases the raw ticket itself
+    rng = random.Random(2)
+    router = Router()
+    raw_tickets = [_raw_ticket(rng) for _ in range(5000)]
+    normalized_tickets = [normalize_ticket(dict(ticket)) for ticket in raw_tickets]
+    
+    for raw, normalized in zip(raw_tickets, normalized_tickets):
+        assert normalized['_message_lc'] == raw['message'].lower()
+        assert analyze(normalized) == analyze(raw), raw
+        assert _analyze_separately(router, normalized) == _analyze_separately(router, raw), raw
+    
+    assert classify_batch(normalized_tickets) == classify_batch(raw_tickets)
+    assert evaluate_batch(normalized_tickets) == evaluate_batch(raw_tickets)
+
+
+@pytest.mark.parametrize("message", ["crıtical", "CRİTICAL now", "aſap", "CRITICAL", "Asap"])
+def test_urgent_words_match_in_every_path(message):
+    ticket = {'subject': '', 'message': message, 'customer_tier': 'Standard', 'revenue': 0}
+    expected = evaluate(ticket).priority_level
+    assert evaluate_batch([ticket])[0].priority_level == expected
+    assert analyze(ticket)[1] == expected
+
+
+@pytest.mark.parametrize("customer_tier, tier", [
+    ('Enterprise', Tier.ENTERPRISE),
+    ('Business', Tier.BUSINESS),
+    ('enterprise', Tier.STANDARD),
+    ('ENTERPRISE', Tier.STANDARD),
+    (None, Tier.STANDARD),
+])
+def test_customer_tier_is_matched_exactly(customer_tier, tier):
+    assert parse_tier(customer_tier) is tier